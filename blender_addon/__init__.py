@@ -24,6 +24,7 @@ if DEV_MODE:
         sys.path.append(addon_path)
 # the string "from ." will be find-and-replaced with "" if run in DEV_MODE
 from . import hallr_ffi_utils
+from . import hallr_collinear_numba
 from . import hallr_2d_delaunay_triangulation
 from . import hallr_mesh_operators
 # from . import hallr_cnc_engravingpanel
@@ -53,8 +54,9 @@ if __name__ == "__main__":
 
     import importlib
 
-    # special treatment for the plain python module hallr_ffi_utils
+    # special treatment for the plain python modules hallr_ffi_utils and hallr_collinear_numba
     importlib.reload(hallr_ffi_utils)
+    importlib.reload(hallr_collinear_numba)
     for module in modules:
         importlib.reload(module)
     register()  # Register everything again
@@ -0,0 +1,74 @@
+"""
+SPDX-License-Identifier: AGPL-3.0-or-later
+Copyright (c) 2023 lacklustr@protonmail.com https://github.com/eadf
+This file is part of the hallr crate.
+"""
+
+import numpy as np
+
+# Numba is not bundled with Blender, so this module is optional. If the import fails bfs_collinear is set to None
+# and the callers fall back to a pure Python implementation.
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _collinear_enough(dot, mag_sq_product, cos_threshold):
+    """ Tests dot / sqrt(mag_sq_product) >= cos_threshold without the sqrt and the division: both sides are squared,
+    with the signs handled separately. Zero length edges pass, just like a zero angle (cosine 1.0) would."""
+    limit = cos_threshold * cos_threshold * mag_sq_product
+    if cos_threshold >= 0.0:
+        return dot >= 0.0 and dot * dot >= limit
+    return dot >= 0.0 or dot * dot <= limit
+
+
+def _bfs_collinear(coords, edges, incidence_indptr, incidence_indices, initial_mask, cos_threshold):
+    """ Compiled version of hallr_mesh_operators.select_collinear_edges().
+    coords is an (V,3) float array, edges is an (E,2) int array, incidence_indptr and incidence_indices is the
+    CSR vertex to edge table from hallr_mesh_operators.vertex_edge_incidence() and initial_mask is an (E,) bool
+    array of the initially selected edges.
+    Returns a new (E,) bool array with all the selected edges."""
+    out_mask = initial_mask.copy()
+    # an edge is marked as selected when it is queued, so it can only be queued once
+    queue = np.empty(len(edges), dtype=np.int64)
+    head = 0
+    tail = 0
+    for e in range(len(edges)):
+        if initial_mask[e]:
+            queue[tail] = e
+            tail += 1
+
+    while head < tail:
+        e = queue[head]
+        head += 1
+        for direction in range(2):
+            from_v = edges[e, 1 - direction]
+            to_v = edges[e, direction]
+            v1x = coords[to_v, 0] - coords[from_v, 0]
+            v1y = coords[to_v, 1] - coords[from_v, 1]
+            v1z = coords[to_v, 2] - coords[from_v, 2]
+            v1mag_sq = v1x * v1x + v1y * v1y + v1z * v1z
+            for k in range(incidence_indptr[to_v], incidence_indptr[to_v + 1]):
+                candidate = incidence_indices[k]
+                if out_mask[candidate]:
+                    continue
+                # the endpoint of the candidate edge that is not to_v
+                tip = edges[candidate, 0] ^ edges[candidate, 1] ^ to_v
+                v2x = coords[tip, 0] - coords[to_v, 0]
+                v2y = coords[tip, 1] - coords[to_v, 1]
+                v2z = coords[tip, 2] - coords[to_v, 2]
+                v2mag_sq = v2x * v2x + v2y * v2y + v2z * v2z
+                if collinear_enough(v1x * v2x + v1y * v2y + v1z * v2z, v1mag_sq * v2mag_sq, cos_threshold):
+                    out_mask[candidate] = True
+                    queue[tail] = candidate
+                    tail += 1
+    return out_mask
+
+
+if njit is not None:
+    collinear_enough = njit(cache=True)(_collinear_enough)
+    bfs_collinear = njit(cache=True)(_bfs_collinear)
+else:
+    collinear_enough = _collinear_enough
+    bfs_collinear = None
@@ -11,6 +11,7 @@ from importlib import reload
 import ctypes
 import bmesh
 import mathutils
+import numpy as np
 
 # workaround for the "ImportError: attempted relative import with no known parent package" problem:
 DEV_MODE = False  # Set this to False for distribution
@@ -106,6 +107,14 @@ def ctypes_close_library(lib):
         dlclose_func(lib._handle)
 
 
+def set_object_mode(mode):
+    """ Switches the active object into `mode` ('OBJECT' or 'EDIT'). The mode_set operator is expensive, it pushes
+    an undo step and tags the depsgraph, so it is skipped when the object already is in that mode."""
+    active_object = bpy.context.view_layer.objects.active
+    if active_object is None or active_object.mode != mode:
+        bpy.ops.object.mode_set(mode=mode)
+
+
 def handle_new_object(mesh_obj):
     bpy.context.collection.objects.link(mesh_obj)
 
@@ -113,7 +122,7 @@ def handle_new_object(mesh_obj):
     bpy.context.view_layer.objects.active = mesh_obj
 
     # Ensure that we are in object mode
-    bpy.ops.object.mode_set(mode='OBJECT')
+    set_object_mode('OBJECT')
 
     # Deselect all objects
     bpy.ops.object.select_all(action='DESELECT')
@@ -229,7 +238,7 @@ def handle_windows_line_modify_active_object(vertices, indices):
     edges = [(indices[i], indices[i + 1]) for i in range(len(indices) - 1)]
 
     # Free the existing geometry
-    bpy.ops.object.mode_set(mode='EDIT')  # Must be in edit mode to use bmesh
+    set_object_mode('EDIT')  # Must be in edit mode to use bmesh
     active_obj.data.update()
     if hasattr(active_obj.data, 'bmesh'):
         active_obj.data.bmesh.free()
@@ -241,7 +250,7 @@ def handle_windows_line_modify_active_object(vertices, indices):
     bm.from_pydata(verts, edges, [])
     bmesh.update_edit_mesh(active_obj.data)  # Update the mesh with the changes
 
-    bpy.ops.object.mode_set(mode='OBJECT')  # Switch back to object mode
+    set_object_mode('OBJECT')  # Switch back to object mode
 
     bm.to_mesh(active_obj.data)
     bm.free()
@@ -251,22 +260,23 @@ def handle_windows_line_modify_active_object(vertices, indices):
 
 
 def unpack_model(options, raw_indices):
-    """Convert the received data into blender mesh edges, faces and world transform"""
-    rv_edges = []
-    rv_faces = []
+    """Convert the received data into blender mesh edges, faces and world transform.
+    raw_indices is a numpy array, the edges are returned as an (E,2) array and the faces as an (F,3) array"""
+    rv_edges = np.empty((0, 2), dtype=np.int32)
+    rv_faces = np.empty((0, 3), dtype=np.int32)
     mesh_format = options.get("mesh.format", None)
     if mesh_format == "line_windows":
         # Convert the indices to Blender's edge format
         # This mode assumes that the line is in the ".window(2)" format,
         # i.e., indices are [0, 1, 2, 3, ...], where [(0,1),(1,2),...] forms edges.
-        rv_edges = [(raw_indices[i], raw_indices[i + 1]) for i in range(len(raw_indices) - 1)]
+        rv_edges = np.column_stack((raw_indices[:-1], raw_indices[1:]))
     elif mesh_format == "line_chunks":
         # This mode assumes that the line is in the ".chunks(2)" format,
         # i.e., indices are [0, 1, 2, 3, ...], where [(0,1), (2,3),...] forms edges.
-        rv_edges = [(raw_indices[i], raw_indices[i + 1]) for i in range(0, len(raw_indices) - 1, 2)]
+        rv_edges = raw_indices[:len(raw_indices) // 2 * 2].reshape(-1, 2)
     elif mesh_format == "triangulated":
         # Assuming indices are [0, 1, 2, 2, 3, 4, ...], where each set of 3 is a triangle
-        rv_faces = [tuple(raw_indices[i:i + 3]) for i in range(0, len(raw_indices), 3)]
+        rv_faces = raw_indices[:len(raw_indices) // 3 * 3].reshape(-1, 3)
     else:
         raise HallrException("Unsupported mesh_format:" + mesh_format)
 
@@ -279,6 +289,24 @@ def unpack_model(options, raw_indices):
     return rv_edges, rv_faces, mathutils.Matrix.Identity(4)
 
 
+def mesh_from_arrays(name, vertices, edges, triangles):
+    """ Creates a new bpy.types.Mesh from an (N,3) vertex array, an (E,2) edge array and an (F,3) triangle array.
+    This is Mesh.from_pydata() done with foreach_set, so the data is never converted to Python objects."""
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set("co", np.ascontiguousarray(vertices, dtype=np.float32).ravel())
+    mesh.edges.add(len(edges))
+    mesh.edges.foreach_set("vertices", np.ascontiguousarray(edges, dtype=np.int32).ravel())
+    mesh.loops.add(len(triangles) * 3)
+    mesh.loops.foreach_set("vertex_index", np.ascontiguousarray(triangles, dtype=np.int32).ravel())
+    mesh.polygons.add(len(triangles))
+    mesh.polygons.foreach_set("loop_start", np.arange(0, len(triangles) * 3, 3, dtype=np.int32))
+    # loop_total is derived from loop_start in newer versions of blender, and read-only
+    if not bpy.types.MeshPolygon.bl_rna.properties["loop_total"].is_readonly:
+        mesh.polygons.foreach_set("loop_total", np.full(len(triangles), 3, dtype=np.int32))
+    return mesh
+
+
 def handle_received_object_replace_active(active_object, options, ffi_vertices, ffi_indices):
     """Takes care of the raw ffi data received from rust, and create a blender mesh out of them"""
 
@@ -302,38 +330,53 @@ def handle_received_object_replace_active(active_object, options, ffi_vertices,
 
     (edges, faces, matrix) = unpack_model(options, ffi_indices)
     if len(faces) > 0 or len(edges) > 0:
-        new_mesh = bpy.data.meshes.new(options.get("model_0_name", "new_mesh"))
-        old_mesh = active_object.data
-
         print("vertices:", len(ffi_vertices))
         print("edges:", len(edges))
         print("faces:", len(faces))
-        new_mesh.from_pydata(ffi_vertices, edges, faces)
+        new_mesh = mesh_from_arrays(options.get("model_0_name", "new_mesh"), ffi_vertices, edges, faces)
         new_mesh.update(calc_edges=True)
-        bm = bmesh.new()
-        bm.from_mesh(new_mesh)
-        bpy.ops.object.mode_set(mode='OBJECT')
-        bm.to_mesh(active_object.data)
-        bpy.ops.object.mode_set(mode='EDIT')
-
-        # print("active_object.update_from_editmode():", active_object.update_from_editmode())
-        if not (old_mesh.users or old_mesh.use_fake_user):
-            bpy.data.meshes.remove(old_mesh)
-            print("removed old mesh")
-        else:
-            print("did not remove old mesh")
+
+        try:
+            if active_object.mode == 'EDIT':
+                # Replace the content of the edit-mesh in place, that way we never have to leave edit mode
+                bm = bmesh.from_edit_mesh(active_object.data)
+                bm.clear()
+                bm.from_mesh(new_mesh)
+                if remove_doubles:
+                    bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=remove_doubles_threshold)
+                bmesh.update_edit_mesh(active_object.data)
+            else:
+                old_mesh = active_object.data
+                bm = bmesh.new()
+                try:
+                    bm.from_mesh(new_mesh)
+                    set_object_mode('OBJECT')
+                    bm.to_mesh(active_object.data)
+                finally:
+                    bm.free()
+                set_object_mode('EDIT')
+
+                # print("active_object.update_from_editmode():", active_object.update_from_editmode())
+                if not (old_mesh.users or old_mesh.use_fake_user):
+                    bpy.data.meshes.remove(old_mesh)
+                    print("removed old mesh")
+                else:
+                    print("did not remove old mesh")
+
+                if remove_doubles:
+                    # sometimes 'mode_set' does not take right away  :/
+                    # bpy.ops.object.editmode_toggle()
+                    bpy.ops.object.mode_set(mode='EDIT')
+                    bpy.ops.mesh.remove_doubles(threshold=remove_doubles_threshold)
+                    bpy.ops.object.editmode_toggle()
+                    bpy.ops.object.mode_set(mode='OBJECT')
+                    bpy.ops.object.mode_set(mode='EDIT')
+        finally:
+            # new_mesh was only needed as a source for the bmesh
+            bpy.data.meshes.remove(new_mesh)
 
         if matrix:
             active_object.matrix_world = matrix
-
-        if remove_doubles:
-            # sometimes 'mode_set' does not take right away  :/
-            # bpy.ops.object.editmode_toggle()
-            bpy.ops.object.mode_set(mode='EDIT')
-            bpy.ops.mesh.remove_doubles(threshold=remove_doubles_threshold)
-            bpy.ops.object.editmode_toggle()
-            bpy.ops.object.mode_set(mode='OBJECT')
-            bpy.ops.object.mode_set(mode='EDIT')
         # if set_origin_to_cursor:
         #    bpy.ops.object.origin_set(type='ORIGIN_CURSOR')
     else:
@@ -365,7 +408,7 @@ def handle_chunks_line_modify_active_object(vertices, indices):
         print("edges:", edges)
 
     # Free the existing geometry
-    bpy.ops.object.mode_set(mode='EDIT')  # Must be in edit mode to use bmesh
+    set_object_mode('EDIT')  # Must be in edit mode to use bmesh
     active_obj.data.update()
     if hasattr(active_obj.data, 'bmesh'):
         active_obj.data.bmesh.free()
@@ -378,7 +421,7 @@ def handle_chunks_line_modify_active_object(vertices, indices):
     # Free the existing BMesh data (if any)
     if active_obj.data.is_editmode:
         # If in edit mode, toggle back to object mode
-        bpy.ops.object.mode_set(mode='OBJECT')
+        set_object_mode('OBJECT')
 
     bm.to_mesh(active_obj.data)
     bm.free()
@@ -469,7 +512,68 @@ def prepare_object_for_processing_direct(obj):
     return obj
 
 
-def call_rust(config: dict[str, str], active_obj, bounding_shape=None, only_selected_vertices=False):
+def config_value_to_str(value):
+    """ Converts a config value to the string representation the rust side parses. bool values become
+    "true"/"false" and floats use repr(), which is locale independent and round-trips exactly."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def string_map_from_config(config):
+    """ Builds a StringMap from the config dictionary. The values may be str, bool, int or float.
+    The returned StringMap keeps references to its ctypes arrays, so the strings stay alive as long as the map."""
+    keys_array = (ctypes.c_char_p * len(config))(*[k.encode('utf-8') for k in config.keys()])
+    values_array = (ctypes.c_char_p * len(config))(*[config_value_to_str(v).encode('utf-8') for v in config.values()])
+    return StringMap(keys_array, values_array, len(config))
+
+
+def vertex_coords(mesh):
+    """ Returns the vertex coordinates of a bpy.types.Mesh as an (N,3) float32 array, fetched with a single
+    foreach_get. The rows have the same memory layout as Vector3."""
+    coords = np.empty((len(mesh.vertices), 3), dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords.ravel())
+    return coords
+
+
+def edge_vertex_indices(mesh):
+    """ Returns the vertex indices of every edge of a bpy.types.Mesh as a flat int32 array, two per edge."""
+    indices = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", indices)
+    return indices
+
+
+def polygon_vertex_indices(mesh):
+    """ Returns the vertex indices of every polygon corner of a bpy.types.Mesh as a flat int32 array, polygon by
+    polygon. Same result as [i for face in mesh.polygons for i in face.vertices], without the Python loop."""
+    loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+    # the position of every corner within its own polygon
+    corner = np.arange(loop_totals.sum()) - np.repeat(np.cumsum(loop_totals) - loop_totals, loop_totals)
+    return loop_vertices[np.repeat(loop_starts, loop_totals) + corner]
+
+
+def usize_array_pointer(indices):
+    """ Converts an index array to the usize array the rust side expects.
+    Returns the converted array, it must be kept alive for as long as the pointer is in use, and the pointer."""
+    indices = np.ascontiguousarray(indices, dtype=np.uintp)
+    return indices, indices.ctypes.data_as(ctypes.POINTER(ctypes.c_size_t))
+
+
+def copy_from_rust(pointer, element_type, count):
+    """ Copies `count` elements of the ctypes `element_type` from a rust owned pointer into a new numpy array"""
+    if count == 0:
+        return np.empty(0, dtype=element_type)
+    return np.ctypeslib.as_array(ctypes.cast(pointer, ctypes.POINTER(element_type)), shape=(count,)).copy()
+
+
+def call_rust(config: dict, active_obj, bounding_shape=None, only_selected_vertices=False):
     # Load the Rust library
     # We load the .dylib and define argtypes for every invocation just to be able to update the lib without
     # restarting blender. This does not seem to work anymore, though
@@ -486,29 +590,29 @@ def call_rust(config: dict[str, str], active_obj, bounding_shape=None, only_sele
             raise RuntimeError("Error in finding the bounding shape.")
 
     if only_selected_vertices:
-        indices = []
-        vertices = [Vector3(v.co.x, v.co.y, v.co.z) for v in active_obj.data.vertices if v.select]
+        indices = np.empty(0, dtype=np.int32)
+        selected = np.empty(len(active_obj.data.vertices), dtype=bool)
+        active_obj.data.vertices.foreach_get("select", selected)
+        vertices = vertex_coords(active_obj.data)[selected]
     else:
         # 4. Gather triangle vertex indices
-        indices = [vert_idx for face in active_obj_to_process.data.polygons for vert_idx in face.vertices]
+        indices = polygon_vertex_indices(active_obj_to_process.data)
 
         # 5. Convert the data to a ctypes-friendly format
-        vertices = [Vector3(v.co.x, v.co.y, v.co.z) for v in active_obj_to_process.data.vertices]
+        vertices = vertex_coords(active_obj_to_process.data)
 
     if bounding_shape:
 
         first_vertex_model_1 = len(vertices)
         first_index_model_1 = len(indices)
         # Appending vertices from the bounding shape
-        vertices += [Vector3(v.co.x, v.co.y, v.co.z) for v in bounding_obj_to_process.data.vertices]
+        vertices = np.concatenate((vertices, vertex_coords(bounding_obj_to_process.data)))
 
         config["first_vertex_model_1"] = str(first_vertex_model_1)
         config["first_index_model_1"] = str(first_index_model_1)
 
         # Appending edge vertex indices from the bounding shape, adjusting based on the start_vertex_index
-        for edge in bounding_obj_to_process.data.edges:
-            indices.append(edge.vertices[0])
-            indices.append(edge.vertices[1])
+        indices = np.concatenate((indices, edge_vertex_indices(bounding_obj_to_process.data)))
 
     if active_obj_is_duplicated:
         cleanup_duplicated_object(active_obj_to_process)
@@ -517,8 +621,9 @@ def call_rust(config: dict[str, str], active_obj, bounding_shape=None, only_sele
         cleanup_duplicated_object(bounding_obj_to_process)
 
     # 6. Convert the data to a ctypes-friendly format
-    vertices_ptr = (Vector3 * len(vertices))(*vertices)
-    indices_ptr = (ctypes.c_size_t * len(indices))(*indices)
+    vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+    vertices_ptr = vertices.ctypes.data_as(ctypes.POINTER(Vector3))
+    indices, indices_ptr = usize_array_pointer(indices)
 
     # Handle the world orientation
     matrices = get_matrices(active_obj)
@@ -527,12 +632,8 @@ def call_rust(config: dict[str, str], active_obj, bounding_shape=None, only_sele
 
     matrices_ptr = (ctypes.c_float * len(matrices))(*matrices)
 
-    # 7. Convert the dictionary to two separate lists for keys and values
-    keys_list = list(config.keys())
-    values_list = list(config.values())
-    keys_array = (ctypes.c_char_p * len(keys_list))(*[k.encode('utf-8') for k in keys_list])
-    values_array = (ctypes.c_char_p * len(values_list))(*[v.encode('utf-8') for v in values_list])
-    map_data = StringMap(keys_array, values_array, len(keys_list))
+    # 7. Convert the dictionary to two separate arrays for keys and values
+    map_data = string_map_from_config(config)
 
     # 8. Make the call to rust
     rust_result = rust_lib.process_geometry(vertices_ptr, len(vertices), indices_ptr, len(indices), matrices_ptr,
@@ -563,8 +664,8 @@ def call_rust(config: dict[str, str], active_obj, bounding_shape=None, only_sele
 
 
 def get_matrices(bpy_object):
-    """ Return the world orientation as an array of 16 floats"""
-    bm = bpy_object.matrix_world
+    """ Return the world orientation as an array of 16 floats, `bpy_object` can also be a matrix"""
+    bm = bpy_object if isinstance(bpy_object, mathutils.Matrix) else bpy_object.matrix_world
     return [bm[0][0], bm[0][1], bm[0][2], bm[0][3],
             bm[1][0], bm[1][1], bm[1][2], bm[1][3],
             bm[2][0], bm[2][1], bm[2][2], bm[2][3],
@@ -577,52 +678,113 @@ def call_rust_direct(config, active_obj, use_line_chunks=False):
     When `expect_line_chunks` is set, the data will iterate over each edge(a,b) and use a list of
     indices in .chunks(2) format.
     If `expect_line_chunks` is not set, the code expect the mesh to be triangulated.
+    Objects in edit mode are read with call_rust_direct_on_edit_mesh, so there is no need to leave edit mode first.
     """
+    return call_rust_packed(config, *pack_object_direct(config, active_obj, use_line_chunks))
 
-    rust_lib = load_latest_dylib()
 
+def call_rust_direct_on_edit_mesh(config, active_obj, use_line_chunks=False):
+    """
+    Same as call_rust_direct, but it reads the data from an object in edit mode without leaving edit mode.
+    The edit-mesh is copied into a throwaway mesh that is transformed into world coordinates, the object
+    itself is not touched.
+    """
+    return call_rust_packed(config, *pack_edit_mesh(config, active_obj, use_line_chunks))
+
+
+def call_rust_direct_on_mesh(config, mesh, use_line_chunks=False, matrix_world=None):
+    """
+    Sends the data of a bpy.types.Mesh to rust. The mesh is expected to already be in world coordinates,
+    so unless `matrix_world` is given, the identity matrix is sent as world orientation.
+    See call_rust_direct for the `use_line_chunks` parameter.
+    """
+    return call_rust_packed(config, *pack_mesh(config, mesh, use_line_chunks, matrix_world))
+
+
+def pack_object_direct(config, active_obj, use_line_chunks=False):
+    """
+    The data gathering part of call_rust_direct. Returns the (vertices, indices, matrices) arrays that
+    call_rust_packed expects.
+    """
+    if active_obj.mode == 'EDIT':
+        return pack_edit_mesh(config, active_obj, use_line_chunks)
     active_obj_to_process = prepare_object_for_processing_direct(active_obj)
-    # handle the vertices
-    vertices = [Vector3(v.co.x, v.co.y, v.co.z) for v in active_obj_to_process.data.vertices]
-    vertices_ptr = (Vector3 * len(vertices))(*vertices)
+    return pack_mesh(config, active_obj_to_process.data, use_line_chunks, active_obj.matrix_world)
+
+
+def pack_edit_mesh(config, active_obj, use_line_chunks=False):
+    """
+    The data gathering part of call_rust_direct_on_edit_mesh. Returns the (vertices, indices, matrices) arrays that
+    call_rust_packed expects.
+    """
+    bm = bmesh.from_edit_mesh(active_obj.data)
+    tmp_mesh = bpy.data.meshes.new("_hallr_tmp")
+    try:
+        bm.to_mesh(tmp_mesh)
+        tmp_mesh.transform(active_obj.matrix_world)
+        return pack_mesh(config, tmp_mesh, use_line_chunks)
+    finally:
+        bpy.data.meshes.remove(tmp_mesh)
+
+
+def pack_mesh(config, mesh, use_line_chunks=False, matrix_world=None):
+    """
+    The data gathering part of call_rust_direct_on_mesh. Copies everything rust needs out of the mesh into
+    numpy arrays, and sets "mesh.format" in the config.
+    Returns the (vertices, indices, matrices) arrays that call_rust_packed expects.
+    """
+    # Handle the vertices, Vector3 has the same memory layout as a row of a (N,3) float32 array
+    vertices = vertex_coords(mesh)
 
     # Handle the indices
     if use_line_chunks:
         config["mesh.format"] = "line_chunks"
-        if len(active_obj_to_process.data.polygons) > 0:
+        if len(mesh.polygons) > 0:
             raise HallrException("The model should not contain any polygons for this operation, only edges! Hint: use "
                                  "the 2d_outline operation to convert a mesh to a 2d outline.")
-        indices = [v for edge in active_obj_to_process.data.edges for v in edge.vertices]
+        indices = edge_vertex_indices(mesh)
     else:
         config["mesh.format"] = "triangulated"
-        # Collect vertices and check if the mesh is fully triangulated
-        indices = []
-        for face in active_obj_to_process.data.polygons:
-            if len(face.vertices) != 3:
-                raise HallrException("The mesh is not fully triangulated!")
-            indices.extend(face.vertices)
-        if len(indices) == 0:
+        # Check if the mesh is fully triangulated, then collect the vertex indices of every triangle
+        loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_total", loop_totals)
+        if np.any(loop_totals != 3):
+            raise HallrException("The mesh is not fully triangulated!")
+        if len(loop_totals) == 0:
             raise HallrException("No polygons found, maybe the mesh is not fully triangulated?")
-    indices_ptr = (ctypes.c_size_t * len(indices))(*indices)
+        indices = polygon_vertex_indices(mesh)
 
     # Handle the world orientation
-    matrices = get_matrices(active_obj)
-    matrices_ptr = (ctypes.c_float * len(matrices))(*matrices)
+    matrices = np.array(get_matrices(matrix_world if matrix_world is not None else mathutils.Matrix.Identity(4)),
+                        dtype=np.float32)
+    return vertices, indices, matrices
+
+
+def call_rust_packed(config, vertices, indices, matrices):
+    """
+    Sends data gathered by one of the pack_* functions to rust, and returns the result as
+    (vertices, indices, output_map).
+    This function does not touch any blender data, so it can be called from a worker thread.
+    """
+    rust_lib = load_latest_dylib()
+
+    vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+    vertices_ptr = vertices.ctypes.data_as(ctypes.POINTER(Vector3))
+    indices, indices_ptr = usize_array_pointer(indices)
+    matrices = np.ascontiguousarray(matrices, dtype=np.float32)
+    matrices_ptr = matrices.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
 
     # Handle the StringMap
-    keys_list = list(config.keys())
-    values_list = list(config.values())
-    keys_array = (ctypes.c_char_p * len(keys_list))(*[k.encode('utf-8') for k in keys_list])
-    values_array = (ctypes.c_char_p * len(values_list))(*[v.encode('utf-8') for v in values_list])
-    map_data = StringMap(keys_array, values_array, len(keys_list))
+    map_data = string_map_from_config(config)
 
     # This calls the rust library
     rust_result = rust_lib.process_geometry(vertices_ptr, len(vertices), indices_ptr, len(indices), matrices_ptr,
                                             len(matrices), map_data)
 
-    output_vertices = [(vec.x, vec.y, vec.z) for vec in
-                       (rust_result.geometry.vertices[i] for i in range(rust_result.geometry.vertex_count))]
-    output_indices = [rust_result.geometry.indices[i] for i in range(rust_result.geometry.indices_count)]
+    # Copy the result into numpy arrays, they stay valid after the rust data has been freed
+    geometry = rust_result.geometry
+    output_vertices = copy_from_rust(geometry.vertices, ctypes.c_float, geometry.vertex_count * 3).reshape(-1, 3)
+    output_indices = copy_from_rust(geometry.indices, ctypes.c_size_t, geometry.indices_count)
 
     output_map = {}
     for i in range(rust_result.map.count):
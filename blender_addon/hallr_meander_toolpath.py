@@ -179,7 +179,7 @@ class OBJECT_OT_GenerateMesh(bpy.types.Operator):
             if settings.enable_adaptive_scan_props:
                 config["z_jump_threshold_multiplier"] = str(settings.z_jump_threshold_multiplier_props)
                 config["xy_sample_dist_multiplier"] = str(settings.xy_sample_dist_multiplier_props)
-                config["reduce_adaptive"] = str(settings.enable_reduce_props).lower()
+                config["reduce_adaptive"] = settings.enable_reduce_props
 
             print("config:", config)
             # Call the Rust function
@@ -4,35 +4,154 @@ Copyright (c) 2023 lacklustr@protonmail.com https://github.com/eadf
 This file is part of the hallr crate.
 """
 
-import random
 import bpy
 import bmesh
 import math
-import array
-from collections import defaultdict
+import queue
+import threading
+import numpy as np
+from collections import deque
 from . import hallr_ffi_utils
-
-
-def angle_between_edges(p0, p1, p2):
-    """ angle between the two vectors defined as p0->p1 and p1->p2
-    return value in degrees. We can't use vertex.calc_edge_angle() because it only accepts
-    vertices only connected to two other vertices (and that is far from the norm in a mesh)"""
-    v1 = p1 - p0
-    v2 = p2 - p1
-
-    v1mag = math.sqrt(v1.x * v1.x + v1.y * v1.y + v1.z * v1.z)
-    if v1mag == 0.0:
-        return 0.0
-
-    v1norm = [v1.x / v1mag, v1.y / v1mag, v1.z / v1mag]
-    v2mag = math.sqrt(v2.x * v2.x + v2.y * v2.y + v2.z * v2.z)
-    if v2mag == 0.0:
-        return 0.0
-
-    v2norm = [v2.x / v2mag, v2.y / v2mag, v2.z / v2mag]
-    res = v1norm[0] * v2norm[0] + v1norm[1] * v2norm[1] + v1norm[2] * v2norm[2]
-    angle = math.degrees(math.acos(max(-1.0, min(res, 1.0))))
-    return angle
+from . import hallr_collinear_numba
+
+
+def vertex_edge_incidence(edges, vertex_count):
+    """ Builds a CSR (compressed sparse row) vertex to edge incidence table from an (E,2) edge array.
+    The indices of the edges connected to vertex v are found at indices[indptr[v]:indptr[v+1]]"""
+    counts = np.bincount(edges.ravel(), minlength=vertex_count)
+    indptr = np.zeros(vertex_count + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    # every edge occupies two consecutive slots in edges.ravel(), so slot // 2 is the edge index
+    indices = np.argsort(edges.ravel(), kind='stable') // 2
+    return indptr, indices
+
+
+def select_collinear_edges(coords, edges, selected, cos_threshold):
+    """ Grows the edge selection along edges that are collinear within the cos_threshold limit.
+    This function only operates on plain arrays: coords is an (V,3) float array, edges is an (E,2) int array
+    and selected is an (E,) bool array of the initially selected edges.
+    Returns a new (E,) bool array with all the selected edges."""
+    indptr, indices = vertex_edge_incidence(edges, len(coords))
+    if hallr_collinear_numba.bfs_collinear is not None:
+        return hallr_collinear_numba.bfs_collinear(coords, edges, indptr, indices, selected, cos_threshold)
+
+    # Most vertices only have a few edges, so a scalar loop over plain lists is faster than batching the
+    # candidates of each edge into small numpy arrays
+    indptr = indptr.tolist()
+    indices = indices.tolist()
+    edge_list = edges.tolist()
+    coords = coords.tolist()
+    collinear_enough = hallr_collinear_numba.collinear_enough
+    # an edge is marked as selected when it is queued, so it can only be queued once
+    is_selected = bytearray(selected.astype(np.uint8).tobytes())  # key by edge.index
+    work_queue = deque(np.flatnonzero(selected).tolist())  # edge.index
+
+    while work_queue:
+        va, vb = edge_list[work_queue.popleft()]
+        for from_v, to_v in ((va, vb), (vb, va)):
+            fx, fy, fz = coords[from_v]
+            tx, ty, tz = coords[to_v]
+            v1x = tx - fx
+            v1y = ty - fy
+            v1z = tz - fz
+            v1mag_sq = v1x * v1x + v1y * v1y + v1z * v1z
+            for candidate in indices[indptr[to_v]:indptr[to_v + 1]]:
+                if is_selected[candidate]:
+                    continue
+                a, b = edge_list[candidate]
+                # the endpoint of the candidate edge that is not to_v
+                px, py, pz = coords[a ^ b ^ to_v]
+                v2x = px - tx
+                v2y = py - ty
+                v2z = pz - tz
+                if collinear_enough(v1x * v2x + v1y * v2y + v1z * v2z,
+                                    v1mag_sq * (v2x * v2x + v2y * v2y + v2z * v2z), cos_threshold):
+                    is_selected[candidate] = 1
+                    work_queue.append(candidate)
+    return np.frombuffer(is_selected, dtype=np.uint8).astype(bool)
+
+
+def select_vertices_until_intersection(edges, selected):
+    """ Grows the vertex selection along connected vertices until an intersection is found.
+    A vertex connected to more than two edges stops the growth, and is not selected itself.
+    This function only operates on plain arrays: edges is an (E,2) int array and selected is an (V,) bool array of
+    the initially selected vertices.
+    Returns a new (V,) bool array with all the selected vertices."""
+    selected = selected.copy()
+    indptr, indices = vertex_edge_incidence(edges, len(selected))
+    # plain lists are faster than numpy arrays when indexed one element at a time
+    indptr = indptr.tolist()
+    indices = indices.tolist()
+    # xor:ing this with one endpoint of an edge gives the other endpoint
+    edge_xor = (edges[:, 0] ^ edges[:, 1]).tolist()
+    already_selected = bytearray(len(selected))  # key by vertex.index
+    work_queue = deque(np.flatnonzero(selected).tolist())  # vertex.index
+
+    while work_queue:
+        v = work_queue.popleft()
+        if already_selected[v]:
+            continue
+
+        if indptr[v + 1] - indptr[v] <= 2:
+            selected[v] = True
+            for e in indices[indptr[v]:indptr[v + 1]]:
+                other_v = edge_xor[e] ^ v
+                if not already_selected[other_v]:
+                    work_queue.append(other_v)
+
+        # only mark vertices as already_selected if they've been through the loop once
+        already_selected[v] = 1
+    return selected
+
+
+def select_elements(elements, mask):
+    """ Selects the edit-mesh elements (bm.verts or bm.edges) flagged in `mask`, the other elements are left
+    untouched. Writing to the edit-mesh directly means that we never have to leave edit mode."""
+    elements.ensure_lookup_table()
+    for i in np.flatnonzero(mask).tolist():
+        elements[i].select = True
+
+
+# Scratch arrays that are reused between operator invocations, see scratch_buffer()
+_scratch_buffers = {}
+
+
+def scratch_buffer(name, size, dtype):
+    """ Returns an uninitialized 1d array of `size` elements. The memory is kept and handed out again on the next call
+    with the same name, so the content is only valid until then. The buffer grows when needed, but never shrinks.
+    The buffers are released when the addon is unregistered."""
+    buffer = _scratch_buffers.get(name)
+    if buffer is None or buffer.dtype != dtype or len(buffer) < size:
+        buffer = np.empty(size, dtype=dtype)
+        _scratch_buffers[name] = buffer
+    return buffer[:size]
+
+
+def vertex_connection_count(obj):
+    """ Counts how many times each vertex of the edit-mode object `obj` is referenced by an edge or a face corner.
+    Both index streams are concatenated so that the counting is done by a single np.bincount."""
+    me = obj.data
+    # Make sure the mesh data is in sync with the edit-mesh
+    obj.update_from_editmode()
+    vertex_indices = scratch_buffer("vertex_indices", len(me.edges) * 2 + len(me.loops), np.int32)
+    me.edges.foreach_get("vertices", vertex_indices[:len(me.edges) * 2])
+    me.loops.foreach_get("vertex_index", vertex_indices[len(me.edges) * 2:])
+    return np.bincount(vertex_indices, minlength=len(me.vertices))
+
+
+def centerline_flags(op):
+    """ Packs the boolean centerline properties of the operator `op` into one bit mask, the bits are the FLAG_*
+    constants of cmd_centerline.rs"""
+    return (op.remove_internals_props << 0
+            | op.keep_input_props << 1
+            | op.negative_radius_props << 2
+            | op.simplify_props << 3
+            | op.weld_props << 4)
+
+
+# The events a modal operator passes through to let the user navigate the view while it is waiting for Rust
+_VIEW_NAVIGATION_EVENTS = {'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE', 'MOUSEMOVE', 'INBETWEEN_MOUSEMOVE',
+                           'TRACKPADPAN', 'TRACKPADZOOM', 'NDOF_MOTION'}
 
 
 class Hallr_2DOutline(bpy.types.Operator):
@@ -46,18 +165,12 @@ class Hallr_2DOutline(bpy.types.Operator):
 
     @classmethod
     def poll(cls, context):
-        return context.active_object is not None
+        ob = context.active_object
+        return ob and ob.type == 'MESH'
 
     def execute(self, context):
         obj = context.active_object
 
-        if obj.type != 'MESH':
-            self.report({'ERROR'}, "Active object is not a mesh!")
-            return {'CANCELLED'}
-
-        # Ensure the object is in object mode
-        bpy.ops.object.mode_set(mode='OBJECT')
-
         config = {"command": "2d_outline"}
 
         # Call the Rust function
@@ -76,34 +189,22 @@ class Hallr_KnifeIntersect(bpy.types.Operator):
 
     @classmethod
     def poll(cls, context):
-        return context.active_object is not None
+        ob = context.active_object
+        return ob and ob.type == 'MESH'
 
     def execute(self, context):
         active_object = context.active_object
-        if active_object is None or active_object.type != 'MESH':
-            self.report({'ERROR'}, "Active object is not a mesh!")
-            return {'CANCELLED'}
-
         if context.mode != 'EDIT_MESH':
             self.report({'ERROR'}, "Must be in edit mode!")
             return {'CANCELLED'}
 
-        # Switch to object mode to gather data without changing the user's selection
-        bpy.ops.object.mode_set(mode='OBJECT')
-
-        bpy.context.view_layer.update()
-
         config = {"command": "knife_intersect"}
 
-        # Call the Rust function
-
-        vertices, indices, config_out = hallr_ffi_utils.call_rust_direct(config, active_object, use_line_chunks=True)
+        # Call the Rust function, the data is read from the edit-mesh so we never have to leave edit mode
+        vertices, indices, config_out = hallr_ffi_utils.call_rust_direct_on_edit_mesh(config, active_object,
+                                                                                      use_line_chunks=True)
         hallr_ffi_utils.handle_received_object_replace_active(active_object, config_out, vertices, indices)
 
-        # Switch back to edit mode
-        bpy.context.view_layer.objects.active = active_object
-        bpy.ops.object.mode_set(mode='EDIT')
-
         return {'FINISHED'}
 
 
@@ -116,33 +217,27 @@ class Hallr_ConvexHull2D(bpy.types.Operator):
 
     @classmethod
     def poll(cls, context):
-        return context.active_object is not None
+        ob = context.active_object
+        return ob and ob.type == 'MESH'
 
     def execute(self, context):
         active_object = context.active_object
-        if active_object is None or active_object.type != 'MESH':
-            self.report({'ERROR'}, "Active object is not a mesh!")
-            return {'CANCELLED'}
-
         if context.mode != 'EDIT_MESH':
             self.report({'ERROR'}, "Must be in edit mode!")
             return {'CANCELLED'}
 
         # Switch to object mode to gather data without changing the user's selection
-        bpy.ops.object.mode_set(mode='OBJECT')
-
-        bpy.context.view_layer.update()
+        hallr_ffi_utils.set_object_mode('OBJECT')
 
         config = {"command": "convex_hull_2d"}
 
         # Call the Rust function
-
         vertices, indices, config_out = hallr_ffi_utils.call_rust(config, active_object, only_selected_vertices=True)
         hallr_ffi_utils.handle_windows_line_new_object(vertices, indices)
 
         # Switch back to edit mode
         bpy.context.view_layer.objects.active = active_object
-        bpy.ops.object.mode_set(mode='EDIT')
+        hallr_ffi_utils.set_object_mode('EDIT')
 
         return {'FINISHED'}
 
@@ -172,20 +267,14 @@ class Hallr_SimplifyRdp(bpy.types.Operator):
 
     @classmethod
     def poll(cls, context):
-        return context.active_object is not None
+        ob = context.active_object
+        return ob and ob.type == 'MESH'
 
     def execute(self, context):
         obj = context.active_object
 
-        if obj.type != 'MESH':
-            self.report({'ERROR'}, "Active object is not a mesh!")
-            return {'CANCELLED'}
-
-        # Ensure the object is in object mode
-        bpy.ops.object.mode_set(mode='OBJECT')
-
-        config = {"command": "simplify_rdp", "simplify_distance": str(self.simplify_distance_props),
-                  "simplify_3d": str(self.simplify_3d_props).lower()}
+        config = {"command": "simplify_rdp", "simplify_distance": self.simplify_distance_props,
+                  "simplify_3d": self.simplify_3d_props}
 
         # Call the Rust function
         vertices, indices, config_out = hallr_ffi_utils.call_rust_direct(config, obj, use_line_chunks=True)
@@ -224,21 +313,13 @@ class Hallr_SelectEndVertices(bpy.types.Operator):
         bm = bmesh.from_edit_mesh(me)
         bpy.ops.mesh.select_all(action='DESELECT')
 
+        # A mesh of only loose vertices has nothing to count, and nothing is selected
         if len(bm.edges) > 0 or len(bm.faces) > 0:
-            vertex_connections = array.array('i', (0 for i in range(0, len(bm.verts))))
-            for e in bm.edges:
-                for vi in e.verts:
-                    vertex_connections[vi.index] += 1
-            for f in bm.faces:
-                for vi in f.verts:
-                    vertex_connections[vi.index] += 1
-
-            for vi in range(0, len(vertex_connections)):
-                if vertex_connections[vi] < 2:
-                    bm.verts[vi].select = True
+            selection = vertex_connection_count(obj) < 2
+            select_elements(bm.verts, selection)
 
-        # Show the updates in the viewport
-        bmesh.update_edit_mesh(me)
+        # Show the updates in the viewport, only the selection changed so skip the topology updates
+        bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
 
         return {'FINISHED'}
 
@@ -274,55 +355,23 @@ class Hallr_SelectCollinearEdges(bpy.types.Operator):
 
         # Get a BMesh representation
         bm = bmesh.from_edit_mesh(me)
-        bm.verts.ensure_lookup_table()
-        bm.edges.ensure_lookup_table()
-        bm.faces.ensure_lookup_table()
-
-        angle_criteria = math.degrees(self.angle_props)
-
-        vertex_dict = defaultdict(list)  # key by vertex.index to [edges]
-        already_selected = set()  # key by edge.index
-        work_queue = set()  # edges
-
-        for e in bm.edges:
-            vertex_dict[e.verts[0].index].append(e)
-            vertex_dict[e.verts[1].index].append(e)
-            if e.select:
-                work_queue.add(e)
-
-        def process_edge(direction, edge):
-            # from_v = edge.verts[0].index if direction == 1 else edge.verts[1].index
-            from_v = edge.verts[direction ^ 1].index
-            to_v = edge.verts[direction].index
-            for candidate_e in vertex_dict.get(to_v, []):
-                if candidate_e.select or candidate_e.index == edge.index:
-                    continue
-
-                if to_v == candidate_e.verts[0].index:
-                    angle = angle_between_edges(bm.verts[from_v].co, bm.verts[to_v].co,
-                                                bm.verts[candidate_e.verts[1].index].co)
-                    if angle <= angle_criteria:
-                        work_queue.add(candidate_e)
-
-                elif to_v == candidate_e.verts[1].index:
-                    angle = angle_between_edges(bm.verts[from_v].co, bm.verts[to_v].co,
-                                                bm.verts[candidate_e.verts[0].index].co)
-                    if angle <= angle_criteria:
-                        work_queue.add(candidate_e)
-
-        while len(work_queue) > 0:
-            e = work_queue.pop()
-            if e.index in already_selected:
-                continue
 
-            process_edge(1, e)  # Process edges in one direction
-            process_edge(0, e)  # Process edges in the other direction
+        # Make sure the mesh data is in sync with the edit-mesh, then fetch all the data in one go
+        obj.update_from_editmode()
+        # co is stored as float32, reading into a buffer of the same type lets foreach_get copy it all in one go
+        coords = scratch_buffer("coords", len(me.vertices) * 3, np.float32).reshape(-1, 3)
+        me.vertices.foreach_get("co", coords.ravel())
+        edges = scratch_buffer("edges", len(me.edges) * 2, np.int32).reshape(-1, 2)
+        me.edges.foreach_get("vertices", edges.ravel())
+        selected = scratch_buffer("selected", len(me.edges), bool)
+        me.edges.foreach_get("select", selected)
 
-            e.select = True
-            already_selected.add(e.index)
+        # angle <= angle_props is the same thing as cos(angle) >= cos(angle_props)
+        new_selection = select_collinear_edges(coords.astype(np.float64), edges, selected, math.cos(self.angle_props))
+        select_elements(bm.edges, new_selection & ~selected)
 
-        # Show the updates in the viewport
-        bmesh.update_edit_mesh(me)
+        # Show the updates in the viewport, only the selection changed so skip the topology updates
+        bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
 
         return {'FINISHED'}
 
@@ -348,21 +397,13 @@ class Hallr_SelectIntersectionVertices(bpy.types.Operator):
         bm = bmesh.from_edit_mesh(me)
         bpy.ops.mesh.select_all(action='DESELECT')
 
+        # A mesh of only loose vertices has nothing to count, and nothing is selected
         if len(bm.edges) > 0 or len(bm.faces) > 0:
-            vertex_connections = array.array('i', (0 for i in range(0, len(bm.verts))))
-            for e in bm.edges:
-                for vi in e.verts:
-                    vertex_connections[vi.index] += 1
-            for f in bm.faces:
-                for vi in f.verts:
-                    vertex_connections[vi.index] += 1
+            selection = vertex_connection_count(obj) > 2
+            select_elements(bm.verts, selection)
 
-            for vi in range(0, len(vertex_connections)):
-                if vertex_connections[vi] > 2:
-                    bm.verts[vi].select = True
-
-        # Show the updates in the viewport
-        bmesh.update_edit_mesh(me)
+        # Show the updates in the viewport, only the selection changed so skip the topology updates
+        bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
 
         return {'FINISHED'}
 
@@ -388,37 +429,20 @@ class Hallr_SelectVerticesUntilIntersection(bpy.types.Operator):
 
         # Get a BMesh representation
         bm = bmesh.from_edit_mesh(me)
-        bm.verts.ensure_lookup_table()
-        bm.edges.ensure_lookup_table()
-        bm.faces.ensure_lookup_table()
 
         if len(bm.edges) > 0 and len(bm.faces) == 0:
-
-            already_selected = set()  # key by vertex.index
-            work_queue = set()  # vertex.index
-
-            for v in bm.verts:
-                if v.select:
-                    work_queue.add(v.index)
-
-            while len(work_queue) > 0:
-                v = work_queue.pop()
-                if v in already_selected:
-                    continue
-
-                if len(bm.verts[v].link_edges) <= 2:
-                    bm.verts[v].select = True
-                    for e in bm.verts[v].link_edges:
-                        if e.verts[0].index != v and e.verts[0].index not in already_selected:
-                            work_queue.add(e.verts[0].index)
-                        if e.verts[1].index != v and e.verts[1].index not in already_selected:
-                            work_queue.add(e.verts[1].index)
-
-                # only mark vertices as already_selected if they've been through the loop once
-                already_selected.add(v)
-
-        # Show the updates in the viewport
-        bmesh.update_edit_mesh(me)
+            # Make sure the mesh data is in sync with the edit-mesh, then fetch the selection in one go
+            obj.update_from_editmode()
+            initial_selection = np.empty(len(me.vertices), dtype=bool)
+            me.vertices.foreach_get("select", initial_selection)
+            edges = scratch_buffer("edges", len(me.edges) * 2, np.int32).reshape(-1, 2)
+            me.edges.foreach_get("vertices", edges.ravel())
+
+            selection = select_vertices_until_intersection(edges, initial_selection)
+            select_elements(bm.verts, selection & ~initial_selection)
+
+        # Show the updates in the viewport, only the selection changed so skip the topology updates
+        bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
         return {'FINISHED'}
 
 
@@ -455,19 +479,12 @@ class Hallr_Voronoi_Mesh(bpy.types.Operator):
     def execute(self, context):
         obj = context.active_object
 
-        if obj.type != 'MESH':
-            self.report({'ERROR'}, "Active object is not a mesh!")
-            return {'CANCELLED'}
-
-        # Ensure the object is in object mode
-        bpy.ops.object.mode_set(mode='OBJECT')
-
         config = {"command": "voronoi_mesh",
-                  "DISTANCE": str(self.distance_props),
-                  "NEGATIVE_RADIUS": str(self.negative_radius_props).lower(),
+                  "DISTANCE": self.distance_props,
+                  "NEGATIVE_RADIUS": self.negative_radius_props,
                   }
-        # Call the Rust function
-        vertices, indices, config_out = hallr_ffi_utils.call_rust_direct(config, obj, use_line_chunks=True)
+        # Call the Rust function, the data is read from the edit-mesh so we never have to leave edit mode
+        vertices, indices, config_out = hallr_ffi_utils.call_rust_direct_on_edit_mesh(config, obj, use_line_chunks=True)
         hallr_ffi_utils.handle_received_object_replace_active(obj, config_out, vertices, indices)
 
         return {'FINISHED'}
@@ -515,16 +532,9 @@ class Hallr_Voronoi_Diagram(bpy.types.Operator):
     def execute(self, context):
         obj = context.active_object
 
-        if obj.type != 'MESH':
-            self.report({'ERROR'}, "Active object is not a mesh!")
-            return {'CANCELLED'}
-
-        # Ensure the object is in object mode
-        bpy.ops.object.mode_set(mode='OBJECT')
-
         config = {"command": "voronoi_diagram",
-                  "DISTANCE": str(self.distance_props),
-                  "KEEP_INPUT": str(self.keep_input_props).lower(),
+                  "DISTANCE": self.distance_props,
+                  "KEEP_INPUT": self.keep_input_props,
                   }
         # Call the Rust function
         vertices, indices, config_out = hallr_ffi_utils.call_rust_direct(config, obj, use_line_chunks=True)
@@ -572,18 +582,11 @@ class Hallr_SdfMesh25D(bpy.types.Operator):
     def execute(self, context):
         obj = context.active_object
 
-        if obj.type != 'MESH':
-            self.report({'ERROR'}, "Active object is not a mesh!")
-            return {'CANCELLED'}
-
-        # Ensure the object is in object mode
-        bpy.ops.object.mode_set(mode='OBJECT')
-
         config = {"command": "sdf_mesh_2_5",
-                  "SDF_DIVISIONS": str(self.sdf_divisions_property),
+                  "SDF_DIVISIONS": self.sdf_divisions_property,
                   }
-        # Call the Rust function
-        vertices, indices, config_out = hallr_ffi_utils.call_rust_direct(config, obj, use_line_chunks=True)
+        # Call the Rust function, the data is read from the edit-mesh so we never have to leave edit mode
+        vertices, indices, config_out = hallr_ffi_utils.call_rust_direct_on_edit_mesh(config, obj, use_line_chunks=True)
         hallr_ffi_utils.handle_received_object_replace_active(obj, config_out, vertices, indices)
 
         return {'FINISHED'}
@@ -636,16 +639,9 @@ class Hallr_SdfMesh(bpy.types.Operator):
     def execute(self, context):
         obj = context.active_object
 
-        if obj.type != 'MESH':
-            self.report({'ERROR'}, "Active object is not a mesh!")
-            return {'CANCELLED'}
-
-        # Ensure the object is in object mode
-        bpy.ops.object.mode_set(mode='OBJECT')
-
         config = {"command": "sdf_mesh",
-                  "SDF_DIVISIONS": str(self.sdf_divisions_prop),
-                  "SDF_RADIUS_MULTIPLIER": str(self.sdf_radius_prop)
+                  "SDF_DIVISIONS": self.sdf_divisions_prop,
+                  "SDF_RADIUS_MULTIPLIER": self.sdf_radius_prop
                   }
 
         # Call the Rust function
@@ -706,33 +702,32 @@ class Hallr_RandomVertices(bpy.types.Operator):
         return ob and ob.type == 'MESH' and context.mode == 'EDIT_MESH'
 
     def execute(self, context):
-        obj = context.active_object
-
-        if obj.type != 'MESH':
-            self.report({'ERROR'}, "Active object is not a mesh!")
-            return {'CANCELLED'}
-
         # Get the mesh data
         mesh = bpy.context.edit_object.data
         bm = bmesh.from_edit_mesh(mesh)
 
-        # Create random vertices
-        for i in range(self.number_of_vertices_prop):
-            angle = random.uniform(0, 2 * math.pi)
-            radius = random.gauss(0, self.std_deviation_prop)
-
-            x = radius * math.cos(angle)
-            y = radius * math.sin(angle)
-
-            # Add vertex to the mesh
-            vert = bm.verts.new((x, y, 0.0))
+        # Generate all the random coordinates in one go
+        number_of_vertices = self.number_of_vertices_prop
+        rng = np.random.default_rng()
+        angles = rng.uniform(0.0, 2.0 * math.pi, number_of_vertices)
+        radii = rng.normal(0.0, self.std_deviation_prop, number_of_vertices)
+        coords = np.zeros((number_of_vertices, 3), dtype=np.float32)
+        coords[:, 0] = radii * np.cos(angles)
+        coords[:, 1] = radii * np.sin(angles)
 
         # Select only the generated vertices
         bpy.ops.mesh.select_all(action='DESELECT')
-        for vert in bm.verts:
-            if vert.index == -1:
-                # this vertex was randomly generated
-                vert.select = True
+
+        # Add the vertices through a temporary mesh, bm.from_mesh() appends all of them to the edit-mesh in one call.
+        # The vertices are created selected.
+        tmp_mesh = bpy.data.meshes.new("_hallr_tmp")
+        try:
+            tmp_mesh.vertices.add(number_of_vertices)
+            tmp_mesh.vertices.foreach_set("co", coords.ravel())
+            tmp_mesh.vertices.foreach_set("select", np.ones(number_of_vertices, dtype=bool))
+            bm.from_mesh(tmp_mesh)
+        finally:
+            bpy.data.meshes.remove(tmp_mesh)
 
         # Merge vertices based on distance
         bpy.ops.mesh.remove_doubles(threshold=self.merge_distance_prop)
@@ -781,15 +776,8 @@ class Hallr_Discretize(bpy.types.Operator):
     def execute(self, context):
         obj = context.active_object
 
-        if obj.type != 'MESH':
-            self.report({'ERROR'}, "Active object is not a mesh!")
-            return {'CANCELLED'}
-
-        # Ensure the object is in object mode
-        bpy.ops.object.mode_set(mode='OBJECT')
-
         config = {"command": "discretize",
-                  "discretize_length": str(self.discretize_length_prop),
+                  "discretize_length": self.discretize_length_prop,
                   }
 
         # Call the Rust function
@@ -814,6 +802,9 @@ class Hallr_Centerline(bpy.types.Operator):
     bl_label = "Hallr 2D Centerline"
     bl_options = {'REGISTER', 'UNDO'}
 
+    # Set while a worker thread is calculating a centerline, only touched on the main thread
+    _busy = False
+
     angle_props: bpy.props.FloatProperty(
         name="Angle",
         description="Edge rejection angle, edges with edge-to-segment angles larger than this will be rejected",
@@ -871,31 +862,166 @@ class Hallr_Centerline(bpy.types.Operator):
         ob = context.active_object
         return ob and ob.type == 'MESH'
 
+    def centerline_config(self):
+        """ Returns the config that is sent to Rust"""
+        return {"command": "centerline",
+                "ANGLE": math.degrees(self.angle_props),
+                "FLAGS": centerline_flags(self),
+                "DISTANCE": self.distance_props,
+                }
+
     def execute(self, context):
         obj = context.active_object
 
-        if obj.type != 'MESH':
-            self.report({'ERROR'}, "Active object is not a mesh!")
+        # Call the Rust function
+        vertices, indices, config_out = hallr_ffi_utils.call_rust_direct(self.centerline_config(), obj,
+                                                                          use_line_chunks=True)
+        hallr_ffi_utils.handle_received_object_replace_active(obj, config_out, vertices, indices)
+
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        # Ctrl-click opens the settings dialog, otherwise run with the last used settings.
+        # They can still be adjusted afterwards in the redo panel (F9), redo calls execute() directly.
+        if event.ctrl:
+            wm = context.window_manager
+            return wm.invoke_props_dialog(self)
+        if context.window is None:
+            return self.execute(context)
+        if Hallr_Centerline._busy:
+            self.report({'WARNING'}, "A centerline is already being calculated")
+            return {'CANCELLED'}
+
+        obj = context.active_object
+        config = self.centerline_config()
+        # The mesh data must be read on the main thread
+        packed = hallr_ffi_utils.pack_object_direct(config, obj, use_line_chunks=True)
+        results = queue.Queue(maxsize=1)
+
+        def run_rust():
+            # Runs on the worker thread, must not touch any blender data. Nor the operator, the result is
+            # handed back to modal() through the queue.
+            try:
+                results.put((hallr_ffi_utils.call_rust_packed(config, *packed), None))
+            except Exception as e:
+                results.put((None, e))
+
+        # Only the name of the object is kept, the object itself may be gone by the time rust is done.
+        self._object_name = obj.name
+        self._object_mode = obj.mode
+        self._results = results
+        threading.Thread(target=run_rust, daemon=True).start()
+        Hallr_Centerline._busy = True
+
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.05, window=context.window)
+        wm.modal_handler_add(self)
+        context.workspace.status_text_set("Calculating the centerline, Esc to cancel")
+        return {'RUNNING_MODAL'}
+
+    def finish(self, context):
+        context.window_manager.event_timer_remove(self._timer)
+        context.workspace.status_text_set(None)
+        Hallr_Centerline._busy = False
+
+    def cancel(self, context):
+        # Called by blender when the modal operator is torn down, e.g. when a new file is loaded
+        self.finish(context)
+
+    def modal(self, context, event):
+        if event.type in {'ESC', 'RIGHTMOUSE'}:
+            # The worker thread can't be stopped, its result is simply never picked up
+            self.finish(context)
+            self.report({'INFO'}, "Centerline cancelled")
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            # Rust works on a copy of the mesh, so anything that could edit the mesh (or undo) is blocked
+            # until the result is in. Only the view can be navigated.
+            if event.type in _VIEW_NAVIGATION_EVENTS:
+                return {'PASS_THROUGH'}
+            return {'RUNNING_MODAL'}
+        try:
+            result, error = self._results.get_nowait()
+        except queue.Empty:
+            return {'PASS_THROUGH'}
+
+        self.finish(context)
+        if error is not None:
+            self.report({'ERROR'}, str(error))
+            return {'CANCELLED'}
+
+        obj = bpy.data.objects.get(self._object_name)
+        if obj is None or obj != context.view_layer.objects.active or obj.mode != self._object_mode:
+            self.report({'ERROR'}, "The object was removed, deactivated or changed mode while the centerline was "
+                                   "calculated")
             return {'CANCELLED'}
 
-        # Ensure the object is in object mode
-        bpy.ops.object.mode_set(mode='OBJECT')
-
-        config = {"command": "centerline",
-                  "ANGLE": str(math.degrees(self.angle_props)),
-                  "REMOVE_INTERNALS"
-                  : str(self.remove_internals_props).lower(),
-                  "KEEP_INPUT"
-                  : str(self.keep_input_props).lower(),
-                  "NEGATIVE_RADIUS"
-                  : str(self.negative_radius_props).lower(),
-                  "DISTANCE"
-                  : str(self.distance_props),
-                  "SIMPLIFY"
-                  : str(self.simplify_props).lower(),
-                  "WELD"
-                  : str(self.weld_props).lower(),
+        vertices, indices, config_out = result
+        hallr_ffi_utils.handle_received_object_replace_active(obj, config_out, vertices, indices)
+        return {'FINISHED'}
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "angle_props")
+        if self.keep_input_props:
+            layout.prop(self, "weld_props")
+        layout.prop(self, "keep_input_props")
+        layout.prop(self, "negative_radius_props")
+        layout.prop(self, "remove_internals_props")
+        if self.simplify_props:
+            layout.prop(self, "distance_props")
+        layout.prop(self, "simplify_props")
+
+
+class Hallr_Pipeline(bpy.types.Operator):
+    """Runs several line operations in one go, the mesh is only sent to Rust once"""
+    bl_idname = "mesh.hallr_meshtools_pipeline"
+    bl_label = "Hallr 2D Discretize, Centerline, Simplify"
+    bl_description = ("Runs discretize, centerline and RDP simplification (or the stages listed in 'Stages') as "
+                      "one operation")
+    bl_options = {'REGISTER', 'UNDO'}
+
+    stages_prop: bpy.props.StringProperty(
+        name="Stages",
+        description="The operations to run, in order, separated by ';'. Valid stages are discretize, centerline "
+                    "and simplify_rdp",
+        default="discretize;centerline;simplify_rdp",
+    )
+
+    # The options of each stage are the same properties as in the standalone operators, so that the pipeline gives
+    # the same result as running those operators one after the other with the same settings
+    discretize_length_prop: Hallr_Discretize.__annotations__["discretize_length_prop"]
+
+    angle_props: Hallr_Centerline.__annotations__["angle_props"]
+    weld_props: Hallr_Centerline.__annotations__["weld_props"]
+    keep_input_props: Hallr_Centerline.__annotations__["keep_input_props"]
+    negative_radius_props: Hallr_Centerline.__annotations__["negative_radius_props"]
+    remove_internals_props: Hallr_Centerline.__annotations__["remove_internals_props"]
+    distance_props: Hallr_Centerline.__annotations__["distance_props"]
+    simplify_props: Hallr_Centerline.__annotations__["simplify_props"]
+
+    simplify_3d_props: Hallr_SimplifyRdp.__annotations__["simplify_3d_props"]
+    simplify_distance_props: Hallr_SimplifyRdp.__annotations__["simplify_distance_props"]
+
+    @classmethod
+    def poll(cls, context):
+        ob = context.active_object
+        return ob and ob.type == 'MESH'
+
+    def execute(self, context):
+        obj = context.active_object
+
+        # All the stages share this config, each stage only reads the keys it knows about
+        config = {"command": "pipeline",
+                  "STAGES": self.stages_prop,
+                  "discretize_length": self.discretize_length_prop,
+                  "ANGLE": math.degrees(self.angle_props),
+                  "FLAGS": centerline_flags(self),
+                  "DISTANCE": self.distance_props,
+                  "simplify_distance": self.simplify_distance_props,
+                  "simplify_3d": self.simplify_3d_props,
                   }
+
         # Call the Rust function
         vertices, indices, config_out = hallr_ffi_utils.call_rust_direct(config, obj, use_line_chunks=True)
         hallr_ffi_utils.handle_received_object_replace_active(obj, config_out, vertices, indices)
@@ -908,6 +1034,10 @@ class Hallr_Centerline(bpy.types.Operator):
 
     def draw(self, context):
         layout = self.layout
+        layout.prop(self, "stages_prop")
+        layout.label(text="Discretize")
+        layout.prop(self, "discretize_length_prop")
+        layout.label(text="Centerline")
         layout.prop(self, "angle_props")
         if self.keep_input_props:
             layout.prop(self, "weld_props")
@@ -917,29 +1047,40 @@ class Hallr_Centerline(bpy.types.Operator):
         if self.simplify_props:
             layout.prop(self, "distance_props")
         layout.prop(self, "simplify_props")
+        layout.label(text="Simplify RDP")
+        layout.prop(self, "simplify_distance_props")
+        layout.prop(self, "simplify_3d_props")
 
 
 # menu containing all tools
 class VIEW3D_MT_edit_mesh_hallr_meshtools(bpy.types.Menu):
     bl_label = "Hallr meshtools"
 
+    # The menu entries, in display order
+    _OPS = (
+        "mesh.hallr_2d_outline",
+        "mesh.hallr_meshtools_select_end_vertices",
+        "mesh.hallr_meshtools_select_collinear_edges",
+        "mesh.hallr_convex_hull_2d",
+        "mesh.hallr_meshtools_select_vertices_until_intersection",
+        "mesh.hallr_meshtools_select_intersection_vertices",
+        "mesh.hallr_meshtools_knife_intersect_2d",
+        "mesh.hallr_meshtools_voronoi_mesh",
+        "mesh.hallr_meshtools_voronoi_diagram",
+        "mesh.hallr_meshtools_sdf_mesh_2_5",
+        "mesh.hallr_meshtools_sdf_mesh",
+        "mesh.hallr_simplify_rdp",
+        "mesh.hallr_centerline",
+        "mesh.hallr_meshtools_discretize",
+        "mesh.hallr_meshtools_random_vertices",
+    )
+
     def draw(self, context):
         layout = self.layout
-        layout.operator("mesh.hallr_2d_outline")
-        layout.operator("mesh.hallr_meshtools_select_end_vertices")
-        layout.operator("mesh.hallr_meshtools_select_collinear_edges")
-        layout.operator("mesh.hallr_convex_hull_2d")
-        layout.operator("mesh.hallr_meshtools_select_vertices_until_intersection")
-        layout.operator("mesh.hallr_meshtools_select_intersection_vertices")
-        layout.operator("mesh.hallr_meshtools_knife_intersect_2d")
-        layout.operator("mesh.hallr_meshtools_voronoi_mesh")
-        layout.operator("mesh.hallr_meshtools_voronoi_diagram")
-        layout.operator("mesh.hallr_meshtools_sdf_mesh_2_5")
-        layout.operator("mesh.hallr_meshtools_sdf_mesh")
-        layout.operator("mesh.hallr_simplify_rdp")
-        layout.operator("mesh.hallr_centerline")
-        layout.operator("mesh.hallr_meshtools_discretize")
-        layout.operator("mesh.hallr_meshtools_random_vertices")
+        layout.operator("mesh.hallr_meshtools_pipeline")
+        layout.separator()
+        for bl_idname in self._OPS:
+            layout.operator(bl_idname)
 
 
 # draw function for integration in menus
@@ -964,6 +1105,7 @@ classes = (
     Hallr_2DOutline,
     Hallr_SimplifyRdp,
     Hallr_Centerline,
+    Hallr_Pipeline,
     Hallr_Discretize,
     Hallr_RandomVertices,
 )
@@ -984,3 +1126,4 @@ def unregister():
         except (RuntimeError, NameError):
             pass
     bpy.types.VIEW3D_MT_edit_mesh_context_menu.remove(menu_func)
+    _scratch_buffers.clear()
@@ -10,6 +10,7 @@ mod cmd_convex_hull_2d;
 mod cmd_delaunay_triangulation_2d;
 mod cmd_discretize;
 mod cmd_knife_intersect;
+mod cmd_pipeline;
 mod cmd_sdf_mesh;
 mod cmd_sdf_mesh_2_5;
 mod cmd_simplify_rdp;
@@ -119,6 +120,21 @@ impl OwnedModel {
         IDENTITY_MATRIX
     }
 
+    /// A closed quadrilateral in the XY plane, shared by the tests of the commands that work with outlines
+    #[cfg(test)]
+    fn quadrilateral() -> Self {
+        Self {
+            world_orientation: Self::identity_matrix(),
+            vertices: vec![
+                (-1.8870333, -0.39229375, 0.010461569).into(),
+                (-0.3180092, -2.0773406, 0.010461569).into(),
+                (2.680789, 0.5384001, 0.010461569).into(),
+                (-0.4052546, 2.4733071, 0.010461569).into(),
+            ],
+            indices: vec![0, 3, 0, 1, 2, 1, 3, 2],
+        }
+    }
+
     pub fn has_identity_orientation(&self) -> bool {
         Model::is_identity_matrix(&self.world_orientation)
     }
@@ -244,6 +260,7 @@ pub(crate) fn process_command(
         "sdf_mesh_2_5" => cmd_sdf_mesh_2_5::process_command(config, models)?,
         "sdf_mesh" => cmd_sdf_mesh::process_command(config, models)?,
         "discretize" => cmd_discretize::process_command(config, models)?,
+        "pipeline" => cmd_pipeline::process_command(config, models)?,
         illegal_command => Err(HallrError::InvalidParameter(format!(
             "Invalid command:{}",
             illegal_command
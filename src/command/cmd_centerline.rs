@@ -26,6 +26,13 @@ use vector_traits::{
 #[cfg(test)]
 mod tests;
 
+// Bits of the optional "FLAGS" option, a packed alternative to the individual boolean options
+const FLAG_REMOVE_INTERNALS: u32 = 1;
+const FLAG_KEEP_INPUT: u32 = 1 << 1;
+const FLAG_NEGATIVE_RADIUS: u32 = 1 << 2;
+const FLAG_SIMPLIFY: u32 = 1 << 3;
+const FLAG_WELD: u32 = 1 << 4;
+
 #[inline(always)]
 /// make a key from v0 and v1, lowest index will always be first
 fn make_edge_key(v0: usize, v1: usize) -> (usize, usize) {
@@ -274,9 +281,16 @@ where
             cmd_arg_angle
         )));
     }
-    let cmd_arg_remove_internals = config
-        .get_parsed_option::<bool>("REMOVE_INTERNALS")?
-        .unwrap_or(true);
+    // The boolean options are either packed into "FLAGS", or given one by one. All of them default to true.
+    let flags = config.get_parsed_option::<u32>("FLAGS")?;
+    let get_flag = |key: &str, bit: u32| -> Result<bool, HallrError> {
+        Ok(match flags {
+            Some(flags) => flags & bit != 0,
+            None => config.get_parsed_option::<bool>(key)?.unwrap_or(true),
+        })
+    };
+
+    let cmd_arg_remove_internals = get_flag("REMOVE_INTERNALS", FLAG_REMOVE_INTERNALS)?;
 
     let cmd_arg_discrete_distance = config.get_mandatory_parsed_option("DISTANCE", None)?;
     if !(0.001.into()..100.0.into()).contains(&cmd_arg_discrete_distance) {
@@ -297,13 +311,11 @@ where
             cmd_arg_max_voronoi_dimension
         )));
     }
-    let cmd_arg_simplify = config
-        .get_parsed_option::<bool>("SIMPLIFY")?
-        .unwrap_or(true);
+    let cmd_arg_simplify = get_flag("SIMPLIFY", FLAG_SIMPLIFY)?;
 
     let (cmd_arg_weld, cmd_arg_keep_input) = {
-        let mut cmd_arg_weld = config.get_parsed_option("WELD")?.unwrap_or(true);
-        let cmd_arg_keep_input = config.get_parsed_option("KEEP_INPUT")?.unwrap_or(true);
+        let mut cmd_arg_weld = get_flag("WELD", FLAG_WELD)?;
+        let cmd_arg_keep_input = get_flag("KEEP_INPUT", FLAG_KEEP_INPUT)?;
 
         if !cmd_arg_keep_input {
             // cmd_arg_keep_input overrides cmd_arg_weld
@@ -312,9 +324,7 @@ where
         (cmd_arg_weld, cmd_arg_keep_input)
     };
 
-    let cmd_arg_negative_radius = config
-        .get_parsed_option::<bool>("NEGATIVE_RADIUS")?
-        .unwrap_or(true);
+    let cmd_arg_negative_radius = get_flag("NEGATIVE_RADIUS", FLAG_NEGATIVE_RADIUS)?;
 
     let mesh_format = config.get_mandatory_option("mesh.format")?;
     if mesh_format.ne("line_chunks") {
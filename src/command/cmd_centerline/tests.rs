@@ -21,23 +21,8 @@ fn test_centerline_1() -> Result<(), HallrError> {
     let _ = config.insert("ANGLE".to_string(), "89.00000133828577".to_string());
     let _ = config.insert("SIMPLIFY".to_string(), "true".to_string());
 
-    let owned_model_0 = OwnedModel {
-        world_orientation: OwnedModel::identity_matrix(),
-        vertices: vec![
-            (-1.8870333, -0.39229375, 0.010461569).into(),
-            (-0.3180092, -2.0773406, 0.010461569).into(),
-            (2.680789, 0.5384001, 0.010461569).into(),
-            (-0.4052546, 2.4733071, 0.010461569).into(),
-        ],
-        indices: vec![0, 3, 0, 1, 2, 1, 3, 2],
-    };
-
-    let model_0 = Model {
-        world_orientation: &owned_model_0.world_orientation,
-        indices: &owned_model_0.indices,
-        vertices: &owned_model_0.vertices,
-    };
-    let models = vec![model_0];
+    let owned_model_0 = OwnedModel::quadrilateral();
+    let models = vec![owned_model_0.as_model()];
     let result = super::process_command::<Vec3>(config, models)?;
     assert_eq!(7, result.0.len()); // vertices
     assert_eq!(18, result.1.len()); // indices
@@ -57,23 +42,8 @@ fn test_centerline_2() -> Result<(), HallrError> {
     let _ = config.insert("command".to_string(), "centerline".to_string());
     let _ = config.insert("ANGLE".to_string(), "89.00000133828577".to_string());
 
-    let owned_model_0 = OwnedModel {
-        world_orientation: OwnedModel::identity_matrix(),
-        vertices: vec![
-            (-1.8870333, -0.39229375, 0.010461569).into(),
-            (-0.3180092, -2.0773406, 0.010461569).into(),
-            (2.680789, 0.5384001, 0.010461569).into(),
-            (-0.4052546, 2.4733071, 0.010461569).into(),
-        ],
-        indices: vec![0, 3, 0, 1, 2, 1, 3, 2],
-    };
-
-    let model_0 = Model {
-        world_orientation: &owned_model_0.world_orientation,
-        indices: &owned_model_0.indices,
-        vertices: &owned_model_0.vertices,
-    };
-    let models = vec![model_0];
+    let owned_model_0 = OwnedModel::quadrilateral();
+    let models = vec![owned_model_0.as_model()];
     let result = super::process_command::<Vec3>(config, models)?;
     assert_eq!(7, result.0.len()); // vertices
     assert_eq!(10, result.1.len()); // indices
@@ -117,3 +87,22 @@ fn test_centerline_3() -> Result<(), HallrError> {
     assert_eq!(44, result.1.len()); // indices
     Ok(())
 }
+
+#[test]
+fn test_centerline_flags() -> Result<(), HallrError> {
+    // same as test_centerline_2, but with the boolean options packed into FLAGS
+    let flags = super::FLAG_REMOVE_INTERNALS | super::FLAG_SIMPLIFY | super::FLAG_WELD;
+    let mut config = ConfigType::default();
+    let _ = config.insert("FLAGS".to_string(), flags.to_string());
+    let _ = config.insert("mesh.format".to_string(), "line_chunks".to_string());
+    let _ = config.insert("DISTANCE".to_string(), "0.004999999888241291".to_string());
+    let _ = config.insert("command".to_string(), "centerline".to_string());
+    let _ = config.insert("ANGLE".to_string(), "89.00000133828577".to_string());
+
+    let owned_model_0 = OwnedModel::quadrilateral();
+    let models = vec![owned_model_0.as_model()];
+    let result = super::process_command::<Vec3>(config, models)?;
+    assert_eq!(7, result.0.len()); // vertices
+    assert_eq!(10, result.1.len()); // indices
+    Ok(())
+}
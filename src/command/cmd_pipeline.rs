@@ -0,0 +1,159 @@
+// SPDX-License-Identifier: AGPL-3.0-or-later
+// Copyright (c) 2023 lacklustr@protonmail.com https://github.com/eadf
+// This file is part of the hallr crate.
+
+#[cfg(test)]
+mod tests;
+
+use crate::{
+    command::{ConfigType, Model, Options},
+    ffi::FFIVector3,
+    HallrError,
+};
+use vector_traits::glam::Vec3A;
+
+/// The same default as the remove doubles operation of the blender addon
+const DEFAULT_REMOVE_DOUBLES_THRESHOLD: f32 = 0.0001;
+
+/// Run one stage of the pipeline. Only the commands that take and return line chunks can be chained.
+fn process_stage(
+    stage: &str,
+    config: ConfigType,
+    models: Vec<Model<'_>>,
+) -> Result<super::CommandResult, HallrError> {
+    Ok(match stage {
+        "discretize" => super::cmd_discretize::process_command(config, models)?,
+        "centerline" => super::cmd_centerline::process_command::<Vec3A>(config, models)?,
+        "simplify_rdp" => super::cmd_simplify_rdp::process_command::<Vec3A>(config, models)?,
+        illegal_stage => Err(HallrError::InvalidParameter(format!(
+            "Invalid pipeline stage:{}",
+            illegal_stage
+        )))?,
+    })
+}
+
+/// Merge the line chunk vertices that are closer than `threshold` to each other, this is what the
+/// blender addon does when a command returns "REMOVE_DOUBLES". Edges that collapse into a single vertex,
+/// and edges that become duplicates, are dropped.
+fn weld_line_chunks(
+    vertices: &[FFIVector3],
+    indices: &[usize],
+    threshold: f32,
+) -> (Vec<FFIVector3>, Vec<usize>) {
+    let threshold = threshold.max(f32::EPSILON);
+    let threshold_sq = threshold * threshold;
+    // the welded vertices are bucketed in a grid with cells of size `threshold`, so any vertex within
+    // `threshold` of a point is found in the 3x3x3 cells surrounding it
+    let cell_of = |v: &FFIVector3| {
+        (
+            (v.x / threshold).floor() as i64,
+            (v.y / threshold).floor() as i64,
+            (v.z / threshold).floor() as i64,
+        )
+    };
+    let mut grid = ahash::AHashMap::<(i64, i64, i64), smallvec::SmallVec<[usize; 1]>>::default();
+    let mut welded_vertices = Vec::<FFIVector3>::with_capacity(vertices.len());
+    let mut remap = Vec::<usize>::with_capacity(vertices.len());
+
+    for v in vertices {
+        let (cx, cy, cz) = cell_of(v);
+        let mut found = None;
+        'search: for x in cx - 1..=cx + 1 {
+            for y in cy - 1..=cy + 1 {
+                for z in cz - 1..=cz + 1 {
+                    if let Some(bucket) = grid.get(&(x, y, z)) {
+                        for &i in bucket.iter() {
+                            let w = &welded_vertices[i];
+                            let (dx, dy, dz) = (w.x - v.x, w.y - v.y, w.z - v.z);
+                            if dx * dx + dy * dy + dz * dz <= threshold_sq {
+                                found = Some(i);
+                                break 'search;
+                            }
+                        }
+                    }
+                }
+            }
+        }
+        let index = match found {
+            Some(i) => i,
+            None => {
+                let i = welded_vertices.len();
+                welded_vertices.push(*v);
+                grid.entry((cx, cy, cz))
+                    .or_insert_with(smallvec::SmallVec::<[usize; 1]>::new)
+                    .push(i);
+                i
+            }
+        };
+        remap.push(index);
+    }
+
+    let mut edge_set = ahash::AHashSet::<(usize, usize)>::default();
+    let mut welded_indices = Vec::<usize>::with_capacity(indices.len());
+    for chunk in indices.chunks_exact(2) {
+        let (a, b) = (remap[chunk[0]], remap[chunk[1]]);
+        if a != b && edge_set.insert((a.min(b), a.max(b))) {
+            welded_indices.push(a);
+            welded_indices.push(b);
+        }
+    }
+    (welded_vertices, welded_indices)
+}
+
+/// Run the pipeline command.
+/// The commands listed in the "STAGES" option (separated by ';') are executed in sequence, the output
+/// of one stage is used as the input of the next. That way the mesh only crosses the FFI boundary
+/// once, no matter how many stages there are.
+/// All the stages share the same config, each stage picks the options it needs from it.
+/// The returned options are merged stage by stage, the options of later stages take precedence.
+/// The exception is "REMOVE_DOUBLES" (and "REMOVE_DOUBLES_THRESHOLD"): when a stage that is followed
+/// by another stage requests it, the vertices are welded right here, before the next stage runs, and
+/// the request is consumed. So only the request of the last stage is passed on to blender.
+pub(crate) fn process_command(
+    config: ConfigType,
+    models: Vec<Model<'_>>,
+) -> Result<super::CommandResult, HallrError> {
+    let stages: Vec<String> = config
+        .get_mandatory_option("STAGES")?
+        .split(';')
+        .map(str::trim)
+        .filter(|stage| !stage.is_empty())
+        .map(str::to_string)
+        .collect();
+    let (first_stage, other_stages) = stages.split_first().ok_or_else(|| {
+        HallrError::InvalidParameter("The pipeline needs at least one stage".to_string())
+    })?;
+
+    let mut result = process_stage(first_stage, config.clone(), models)?;
+    for stage in other_stages {
+        let (mut vertices, mut indices, world_orientation, mut return_config) = result;
+        if vertices.is_empty() {
+            return Err(HallrError::InvalidInputData(format!(
+                "The stage before {} returned no geometry",
+                stage
+            )));
+        }
+        if return_config
+            .get_parsed_option::<bool>("REMOVE_DOUBLES")?
+            .unwrap_or(false)
+        {
+            let threshold = return_config
+                .get_parsed_option::<f32>("REMOVE_DOUBLES_THRESHOLD")?
+                .unwrap_or(DEFAULT_REMOVE_DOUBLES_THRESHOLD);
+            (vertices, indices) = weld_line_chunks(&vertices, &indices, threshold);
+        }
+        let _ = return_config.remove("REMOVE_DOUBLES");
+        let _ = return_config.remove("REMOVE_DOUBLES_THRESHOLD");
+
+        let model = Model {
+            world_orientation: &world_orientation,
+            vertices: &vertices,
+            indices: &indices,
+        };
+        let (vertices, indices, world_orientation, stage_config) =
+            process_stage(stage, config.clone(), vec![model])?;
+        return_config.extend(stage_config);
+        result = (vertices, indices, world_orientation, return_config);
+    }
+    Ok(result)
+}
@@ -0,0 +1,139 @@
+// SPDX-License-Identifier: AGPL-3.0-or-later
+// Copyright (c) 2023 lacklustr@protonmail.com https://github.com/eadf
+// This file is part of the hallr crate.
+
+use crate::{
+    command::{ConfigType, Model, OwnedModel},
+    ffi::FFIVector3,
+    HallrError,
+};
+use vector_traits::glam::Vec3A;
+
+fn test_model() -> OwnedModel {
+    OwnedModel {
+        world_orientation: OwnedModel::identity_matrix(),
+        vertices: vec![
+            (1.203918, 1.203918, 0.0).into(),
+            (-1.805877, 0.74801874, 0.0).into(),
+            (0.0, -1.7025971, 0.0).into(),
+            (-0.36410117, 0.33949375, 0.0).into(),
+            (0.25582898, -0.17708552, 0.0).into(),
+            (-0.6682936, 5.8671384, 0.50151926).into(),
+        ],
+        indices: vec![0, 1, 2, 0, 1, 2, 2, 5],
+    }
+}
+
+fn test_config(stages: &str) -> ConfigType {
+    let mut config = ConfigType::default();
+    let _ = config.insert("mesh.format".to_string(), "line_chunks".to_string());
+    let _ = config.insert("discretize_length".to_string(), "50.0".to_string());
+    let _ = config.insert("simplify_distance".to_string(), "0.1".to_string());
+    let _ = config.insert("ANGLE".to_string(), "89.0".to_string());
+    let _ = config.insert("DISTANCE".to_string(), "0.005".to_string());
+    let _ = config.insert("command".to_string(), "pipeline".to_string());
+    let _ = config.insert("STAGES".to_string(), stages.to_string());
+    config
+}
+
+#[test]
+fn test_pipeline_1() -> Result<(), HallrError> {
+    // a single stage pipeline is the same thing as the command itself
+    let owned_model_0 = test_model();
+    let result = super::process_command(test_config("discretize"), vec![owned_model_0.as_model()])?;
+    assert_eq!(8, result.0.len()); // vertices
+    assert_eq!(12, result.1.len()); // indices
+    Ok(())
+}
+
+#[test]
+fn test_pipeline_2() -> Result<(), HallrError> {
+    // the pipeline must give the same result as running the commands one after the other
+    let owned_model_0 = test_model();
+    let config = test_config(" discretize; simplify_rdp ;");
+    let result = super::process_command(config.clone(), vec![owned_model_0.as_model()])?;
+
+    let discretized = crate::command::cmd_discretize::process_command(
+        config.clone(),
+        vec![owned_model_0.as_model()],
+    )?;
+    let model = Model {
+        world_orientation: &discretized.2,
+        vertices: &discretized.0,
+        indices: &discretized.1,
+    };
+    let expected = crate::command::cmd_simplify_rdp::process_command::<Vec3A>(config, vec![model])?;
+    assert_eq!(expected.0.len(), result.0.len()); // vertices
+    assert_eq!(expected.1, result.1); // indices
+    Ok(())
+}
+
+#[test]
+fn test_pipeline_3() -> Result<(), HallrError> {
+    // the default stages of the blender operator
+    let owned_model_0 = OwnedModel::quadrilateral();
+    let config = test_config("discretize;centerline;simplify_rdp");
+    let result = super::process_command(config.clone(), vec![owned_model_0.as_model()])?;
+    assert!(!result.0.is_empty());
+
+    let discretized = crate::command::cmd_discretize::process_command(
+        config.clone(),
+        vec![owned_model_0.as_model()],
+    )?;
+    let model = Model {
+        world_orientation: &discretized.2,
+        vertices: &discretized.0,
+        indices: &discretized.1,
+    };
+    let centerline =
+        crate::command::cmd_centerline::process_command::<Vec3A>(config.clone(), vec![model])?;
+    // the centerline stage asks for its output to be welded, the pipeline does that before the next stage
+    assert_eq!(
+        Some(&"true".to_string()),
+        centerline.3.get("REMOVE_DOUBLES")
+    );
+    let (vertices, indices) = super::weld_line_chunks(&centerline.0, &centerline.1, 0.0001);
+    let model = Model {
+        world_orientation: &centerline.2,
+        vertices: &vertices,
+        indices: &indices,
+    };
+    let expected = crate::command::cmd_simplify_rdp::process_command::<Vec3A>(config, vec![model])?;
+    assert_eq!(expected.0.len(), result.0.len()); // vertices
+    assert_eq!(expected.1, result.1); // indices
+
+    // the weld request is consumed by the pipeline, only the request of the last stage is returned
+    assert_eq!(
+        expected.3.get("REMOVE_DOUBLES"),
+        result.3.get("REMOVE_DOUBLES")
+    );
+    Ok(())
+}
+
+#[test]
+fn test_weld_line_chunks() {
+    let vertices: Vec<FFIVector3> = vec![
+        (0.0, 0.0, 0.0).into(),
+        (1.0, 0.0, 0.0).into(),
+        (1.00005, 0.0, 0.0).into(),
+        (2.0, 0.0, 0.0).into(),
+        (0.0, 0.00005, 0.0).into(),
+        (1.0, 0.0, 0.00005).into(),
+    ];
+    // the last edge is a duplicate of the first one once welded
+    let indices = vec![0, 1, 2, 3, 4, 5];
+    let (vertices, indices) = super::weld_line_chunks(&vertices, &indices, 0.0001);
+    assert_eq!(3, vertices.len());
+    assert_eq!(vec![0, 1, 1, 2], indices);
+}
+
+#[test]
+fn test_pipeline_illegal_stage() {
+    let owned_model_0 = test_model();
+    assert!(super::process_command(
+        test_config("discretize;no_such_command"),
+        vec![owned_model_0.as_model()]
+    )
+    .is_err());
+    assert!(super::process_command(test_config(";"), vec![owned_model_0.as_model()]).is_err());
+}